@@ -5,37 +5,350 @@ A CLI application for managing your e-book collection with lists and symlinks
 """
 
 import os
+import stat
+import itertools
 import json
+import mmap
 import shutil
 import subprocess
 import platform
+import queue
+import sqlite3
+import threading
+import time
 from pathlib import Path
 from datetime import datetime
 import sys
 
+try:
+    import readline
+except ImportError:  # Optional: not available on Windows; paths are then typed in full
+    readline = None
+
+try:
+    import orjson
+except ImportError:  # Optional: falls back to the standard json module
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # Optional: the snapshot stays JSON without it
+    msgpack = None
+
+_IS_WIN = os.name == 'nt'
+_SYS = platform.system()
+_SIZE_UNITS = ("B", "KB", "MB", "GB", "TB")
+# Folder clutter import_folder skips besides dotfiles
+_IGNORED_FILES = frozenset({"Thumbs.db", "desktop.ini"})
+_SEP75 = "═" * 75
+_SEP60 = "═" * 60
+
+
+def _dumps(obj):
+    """Serialize an object to compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode('utf-8')
+
+
+def _loads(data):
+    """Parse JSON from bytes"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(bytes(data))  # json can't parse a memoryview directly
+
+
+def _encode_snapshot(obj):
+    """Serialize the database snapshot, as MessagePack when available"""
+    if msgpack is not None:
+        return msgpack.packb(obj, use_bin_type=True)
+    return _dumps(obj)
+
+
+def _decode_snapshot(data):
+    """Parse a database snapshot written by _encode_snapshot"""
+    if msgpack is not None:
+        return msgpack.unpackb(data, raw=False)
+    return _loads(data)
+
+
+def _read_mapped(path, decode):
+    """Decode a file through a read-only memory map instead of reading it into bytes"""
+    with open(path, 'rb') as f:
+        # mmap refuses empty files; treat one like any other unparseable snapshot
+        if os.fstat(f.fileno()).st_size == 0:
+            raise ValueError(f"{path} is empty")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+            return decode(view)
+
+
+ASCII_ART = """
+╔═════════════════════════════════════════════════════════════════════════╗
+║   ░█████╗░░███╗░░██╗░░░░░██╗██████╗░██████╗░░█████╗░██████╗░██╗░░░██╗   ║
+║   ██╔══██╗░███║░░██║░░░░░██║██╔══██╗██╔══██╗██╔══██╗██╔══██╗╚██╗░██╔╝   ║
+║   ██║░░██║░╚██║░░██║░░░░░██║██████╦╝██████╔╝███████║██████╔╝░╚████╔╝░   ║
+║   ██║░░██║░░██║░░██║░░░░░██║██╔══██╗██╔══██╗██╔══██║██╔══██╗░░╚██╔╝░░   ║
+║   ╚█████╔╝░░██║░░███████╗██║██████╦╝██║░░██║██║░░██║██║░░██║░░░██║░░░   ║
+║   ░╚════╝░░░╚═╝░░╚══════╝╚═╝╚═════╝░╚═╝░░╚═╝╚═╝░░╚═╝╚═╝░░╚═╝░░░╚═╝░░░   ║
+║                                                                         ║
+║                    📚 Your Personal E-book Library 📚                   ║
+║                                                                         ║
+╚═════════════════════════════════════════════════════════════════════════╝
+"""
+
+MENU = """
+🔹 MAIN MENU 🔹
+1. 📖 Add Book
+2. 🗑️  Delete Book
+3. 📋 Add List
+4. 🗂️  Delete List
+5. 📚 Switch Lists
+6. 📜 Show All Books
+7. 📂 Open Book
+8. 🚪 Exit
+9. 📥 Import Folder
+
+Choose an option (1-9): """
+
+
+def _is_storable(path):
+    """Whether a path can be saved in the database; undecodable names don't encode as UTF-8"""
+    try:
+        path.encode('utf-8')
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+# Platform-specific helpers are picked once at import instead of branching per call
+if _IS_WIN:
+    def _link_book(src, dst):
+        """Copy a book into a list directory, raising FileExistsError if dst is taken"""
+        # Symlinks need extra privileges on Windows, so copy instead
+        if os.path.lexists(dst):
+            raise FileExistsError(f"File exists: '{dst}'")
+        shutil.copy2(src, dst)
+else:  # Unix/Linux/Mac
+    _link_book = os.symlink
+
+if _SYS == "Windows":
+    def _open_file(path):
+        """Open a file with the default application"""
+        os.startfile(path)
+else:
+    _OPENER = "open" if _SYS == "Darwin" else "xdg-open"  # macOS / other Unix-like
+    
+    def _open_file(path):
+        """Open a file with the default application without waiting for it"""
+        # The viewer runs detached and can't report a missing file back to us
+        os.stat(path)
+        try:
+            # Detached from the terminal so viewer chatter can't scribble over the menu
+            subprocess.Popen([_OPENER, path], stdout=subprocess.DEVNULL,
+                             stderr=subprocess.DEVNULL, start_new_session=True)
+        except FileNotFoundError:
+            raise OSError(f"No default application found ({_OPENER} is not installed)") from None
+
+
+def _enable_vt_mode():
+    """Turn on ANSI escape processing in the Windows console, returning whether it worked"""
+    try:
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.GetStdHandle(-11)  # STD_OUTPUT_HANDLE
+        mode = ctypes.c_uint32()
+        if not kernel32.GetConsoleMode(handle, ctypes.byref(mode)):
+            return False
+        # ENABLE_VIRTUAL_TERMINAL_PROCESSING
+        return bool(kernel32.SetConsoleMode(handle, mode.value | 0x0004))
+    except (ImportError, AttributeError, OSError):
+        return False
+
+
+# Every POSIX terminal understands ANSI; Windows 10+ consoles do once VT mode is on
+_ANSI_CLEAR = not _IS_WIN or _enable_vt_mode()
+
+
+def _clear_screen():
+    """Clear the terminal"""
+    if not sys.stdout.isatty():
+        # Redirected output: escape codes would only end up in the file or pipe
+        return
+    if _ANSI_CLEAR:
+        # ANSI clear + cursor home: a single write instead of forking a shell
+        sys.stdout.write("\x1b[2J\x1b[H")
+    else:
+        # Consoles without VT support (pre-Windows 10)
+        os.system('cls')
+
+
+def _path_completer(text, state):
+    """readline completer that expands a partial path from one scandir pass"""
+    if state == 0:
+        directory, prefix = os.path.split(os.path.expanduser(text))
+        try:
+            with os.scandir(directory or '.') as entries:
+                _path_completer.matches = sorted(
+                    os.path.join(directory, entry.name) + (os.sep if entry.is_dir() else "")
+                    for entry in entries if entry.name.startswith(prefix))
+        except OSError:
+            _path_completer.matches = []
+    matches = _path_completer.matches
+    return matches[state] if state < len(matches) else None
+
+
+_path_completer.matches = []
+
+
+class SqliteStore:
+    """Alternative storage backend keeping the library in an SQLite database"""
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS lists (name TEXT PRIMARY KEY);
+        CREATE TABLE IF NOT EXISTS books (
+            list TEXT NOT NULL,
+            name TEXT NOT NULL,
+            size INTEGER,
+            location TEXT NOT NULL,
+            added_ts REAL,
+            PRIMARY KEY (list, name)
+        );
+        CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT);
+    """
+    
+    def __init__(self, db_file):
+        self.db_file = db_file
+        # Autocommit; every mutation is a single statement or an explicit transaction
+        self.conn = sqlite3.connect(db_file, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+    
+    def load(self):
+        """Read the whole library into the in-memory database layout"""
+        lists = {name: [] for (name,) in self.conn.execute("SELECT name FROM lists ORDER BY rowid")}
+        if not lists:
+            self.conn.execute("INSERT INTO lists (name) VALUES ('default')")
+            lists["default"] = []
+        
+        for list_name, name, size, location, added_ts in self.conn.execute(
+                "SELECT list, name, size, location, added_ts FROM books ORDER BY rowid"):
+            lists.setdefault(list_name, []).append({
+                "name": name,
+                "size": size,
+                "location": location,
+                "added_date": added_ts
+            })
+        
+        row = self.conn.execute("SELECT value FROM settings WHERE key = 'current_list'").fetchone()
+        current_list = row[0] if row and row[0] in lists else next(iter(lists))
+        return {"lists": lists, "current_list": current_list}
+    
+    def apply(self, record):
+        """Persist a single delta record"""
+        op = record["op"]
+        
+        if op == "add_book":
+            book = record["book"]
+            self.conn.execute("INSERT OR IGNORE INTO lists (name) VALUES (?)", (record["list"],))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO books (list, name, size, location, added_ts) VALUES (?, ?, ?, ?, ?)",
+                (record["list"], book["name"], book["size"], book["location"], book["added_date"]))
+        elif op == "delete_book":
+            self.conn.execute("DELETE FROM books WHERE list = ? AND name = ?",
+                              (record["list"], record["name"]))
+        elif op == "add_list":
+            self.conn.execute("INSERT OR IGNORE INTO lists (name) VALUES (?)", (record["list"],))
+        elif op == "delete_list":
+            self.conn.execute("BEGIN")
+            try:
+                self.conn.execute("DELETE FROM books WHERE list = ?", (record["list"],))
+                self.conn.execute("DELETE FROM lists WHERE name = ?", (record["list"],))
+            except Exception:
+                # Don't leave later autocommit writes inside a half-done transaction
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+        elif op == "switch":
+            self.conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('current_list', ?)",
+                              (record["list"],))
+    
+    def close(self):
+        """Close the database connection"""
+        self.conn.close()
+
+
 class EbookLibrary:
+    # Rewrite the snapshot once the write-ahead log grows past this size
+    WAL_COMPACT_BYTES = 1_000_000
+    # The background writer fsyncs the log at most this often, or per this many records
+    WAL_FSYNC_INTERVAL = 0.05
+    WAL_FSYNC_BATCH = 64
+    # Set to "sqlite" to keep the library in SQLite instead of snapshot + log files
+    BACKEND_ENV = "EBOOK_LIBRARY_BACKEND"
+
     def __init__(self):
         #Library location
         self.base_dir = Path.home() / "01Library"
         self.books_dir = self.base_dir / "books"
         self.database_dir = self.base_dir / "database"
-        self.db_file = self.database_dir / "library.json"
+        self.json_db_file = self.database_dir / "library.json"
+        self.msgpack_db_file = self.database_dir / "library.mpk"
+        self.db_file = self.msgpack_db_file if msgpack is not None else self.json_db_file
+        self.snapshot_file = self.db_file
+        self.wal_file = self.database_dir / "library.wal.jsonl"
+        self.sqlite_db_file = self.database_dir / "library.sqlite3"
+        self.history_file = Path.home() / ".01library_history"
+        self._history_loaded = False
+        self.store = None
         self.current_list = "default"
+        self._current_books = None
+        # Only the current list changes between redraws; the rest of the banner is built once
+        self._banner_head = f"{ASCII_ART}\n📁 Library Path: {self.base_dir}\n📂 Current List: "
+        self._wal_fh = None
+        self._wal_bytes = 0
+        # Bumped by every compaction; the snapshot and the log header both carry it
+        self._log_generation = 0
+        # Whether memory holds changes the snapshot doesn't
+        self._dirty = False
+        self._wal_queue = queue.Queue()
+        self._wal_lock = threading.Lock()
+        self._writer = None
+        # Set by the writer thread when a write or fsync fails; from then on records
+        # are written synchronously so failures reach the caller
+        self._wal_error = None
+        self._wal_sync = False
+        self._name_index = {}
+        self._list_cache = {}
+        # String "books/<list>/" prefixes; hot paths join names onto them without Path objects
+        self._books_dir_str = os.path.join(self.books_dir, "")
+        self._list_dir_str_cache = {}
+        # Menu choice -> action; Exit ('8') is handled by run() itself
+        self._dispatch = {
+            '1': self.add_book,
+            '2': self.delete_book,
+            '3': self.add_list,
+            '4': self.delete_list,
+            '5': self.switch_lists,
+            '6': self.show_all_books,
+            '7': self.open_book,
+            '9': self.import_folder,
+        }
         
         # Initialize directories and database
         self.setup_directories()
         self.load_database()
+        self.setup_list_directories()
     
     def setup_directories(self):
         """Create necessary directories if they don't exist"""
         try:
-            # Create base directory first
-            self.base_dir.mkdir(exist_ok=True, parents=True)
-            self.books_dir.mkdir(exist_ok=True)
-            self.database_dir.mkdir(exist_ok=True)
-            
-            # Create lists subdirectories in books
-            (self.books_dir / "default").mkdir(exist_ok=True)
+            # Stat first so an existing library costs no mkdir calls
+            for directory in (self.books_dir, self.database_dir):
+                try:
+                    os.stat(directory)
+                except FileNotFoundError:
+                    os.makedirs(directory)
             
             print(f"📁 Library location: {self.base_dir}")
             
@@ -47,60 +360,475 @@ class EbookLibrary:
             print(f"❌ Error creating directories: {e}")
             sys.exit(1)
     
+    def setup_list_directories(self):
+        """Create the directory of every list in the database that is missing one"""
+        try:
+            with os.scandir(self.books_dir) as entries:
+                # Follow links: a list directory may be a symlink to another drive
+                existing = {entry.name for entry in entries if entry.is_dir()}
+            
+            for list_name in self.database["lists"]:
+                if list_name not in existing:
+                    try:
+                        (self.books_dir / list_name).mkdir(exist_ok=True)
+                    except OSError as e:
+                        # A dangling link (unmounted drive) or a stray file; the other
+                        # lists stay usable, so warn instead of refusing to start
+                        print(f"⚠️ List '{list_name}' has no usable directory: {e}")
+        except OSError as e:
+            print(f"❌ Error creating list directories: {e}")
+            sys.exit(1)
+    
     def load_database(self):
-        """Load or create the database"""
-        if self.db_file.exists():
+        """Load or create the database, then replay the write-ahead log"""
+        if os.environ.get(self.BACKEND_ENV, "").lower() == "sqlite":
+            self.store = SqliteStore(self.sqlite_db_file)
+            self.database = self.store.load()
+            self._set_current_list(self.database["current_list"])
+            return
+        
+        if msgpack is None and self.msgpack_db_file.exists():
+            print(f"❌ {self.msgpack_db_file} is a MessagePack database.")
+            print("Please install msgpack (pip install msgpack) to open it.")
+            sys.exit(1)
+        
+        # One-shot migration of a JSON snapshot into the MessagePack format
+        migrate = (self.snapshot_file != self.json_db_file
+                   and not self.snapshot_file.exists()
+                   and self.json_db_file.exists())
+        
+        if migrate:
+            try:
+                self.database = _read_mapped(self.json_db_file, _loads)
+            except (ValueError, FileNotFoundError):
+                # Never replace a JSON file we couldn't read; leave it for recovery
+                print(f"⚠️ Could not read {self.json_db_file}; it was left untouched.")
+                self.database = {"lists": {"default": []}, "current_list": "default"}
+                migrate = False
+        elif self.snapshot_file.exists():
             try:
-                with open(self.db_file, 'r') as f:
-                    self.database = json.load(f)
-            except (json.JSONDecodeError, FileNotFoundError):
-                self.database = {"lists": {"default": {}}, "current_list": "default"}
+                self.database = _read_mapped(self.snapshot_file, _decode_snapshot)
+            except (ValueError, FileNotFoundError):
+                self.database = {"lists": {"default": []}, "current_list": "default"}
         else:
-            self.database = {"lists": {"default": {}}, "current_list": "default"}
+            self.database = {"lists": {"default": []}, "current_list": "default"}
+        
+        self._log_generation = self.database.get("log_generation", 0)
+        self._migrate_book_lists()
+        self._replay_wal()
+        self._migrate_added_dates()
+        self._set_current_list(self.database.get("current_list", "default"))
+        self._wal_fh = open(self.wal_file, 'ab')
+        if not self._wal_fh.tell():
+            self._write_log_header()
+        self._wal_bytes = self._wal_fh.tell()
+        if migrate:
+            self._dirty = True
+        
+        if migrate:
+            self._compact()
+            self.json_db_file.unlink()
+        
+        self._writer = threading.Thread(target=self._writer_loop, daemon=True)
+        self._writer.start()
+    
+    def _replay_wal(self):
+        """Apply every delta record from the write-ahead log to the database"""
+        if not self.wal_file.exists():
+            return
+        
+        good_end = 0
+        last = b""
+        torn = False
+        stale = False
+        holes = set()
+        with open(self.wal_file, 'rb') as f:
+            for raw in f:
+                line = raw.strip()
+                if line:
+                    try:
+                        record = _loads(line)
+                    except ValueError:
+                        # A torn final write from a crash; everything before it is valid
+                        torn = True
+                        break
+                    if record["op"] == "generation":
+                        if record["gen"] < self._log_generation:
+                            # A crash between the snapshot rename and the log truncate:
+                            # the snapshot already holds every record in this log
+                            stale = True
+                            break
+                    else:
+                        self._apply_record(record, holes)
+                        self._dirty = True
+                good_end += len(raw)
+                last = raw
+        
+        # Close the holes deleted books left behind, once per list
+        lists = self.database["lists"]
+        for list_name in holes:
+            if list_name in lists:
+                lists[list_name] = [book_info for book_info in lists[list_name] if book_info is not None]
+            self._forget_list(list_name)
+        
+        if stale:
+            with open(self.wal_file, 'r+b') as f:
+                f.truncate(0)
+            return
         
-        self.current_list = self.database.get("current_list", "default")
+        # Appending after a partial line would glue the next record onto it, and the
+        # merged line would stop every later replay, so repair the tail first
+        unterminated = last and not last.endswith(b"\n")
+        if torn or unterminated:
+            with open(self.wal_file, 'r+b') as f:
+                f.truncate(good_end)
+                if unterminated:
+                    f.seek(good_end)
+                    f.write(b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+    
+    def _migrate_book_lists(self):
+        """Convert lists stored as {name: info} dicts by older databases to lists"""
+        lists = self.database["lists"]
+        for list_name, books in lists.items():
+            if isinstance(books, dict):
+                lists[list_name] = list(books.values())
+                self._dirty = True
+    
+    def _migrate_added_dates(self):
+        """Convert ISO-8601 added dates from older databases to epoch seconds"""
+        for books in self.database["lists"].values():
+            for book_info in books:
+                added_date = book_info.get('added_date')
+                if isinstance(added_date, str):
+                    book_info['added_date'] = datetime.fromisoformat(added_date).timestamp()
+                    self._dirty = True
+    
+    def _apply_record(self, record, holes):
+        """Apply a single replayed delta record to the in-memory database"""
+        op = record["op"]
+        lists = self.database["lists"]
+        
+        if op == "add_book":
+            self._add_to_list(record["list"], record["book"])
+        elif op == "delete_book":
+            # Blank the slot instead of shifting the list and rebuilding its index
+            # per delete; _replay_wal drops the blanks of every list in `holes`
+            position = self._get_name_index(record["list"]).pop(record["name"], None)
+            if position is not None:
+                self.database["lists"][record["list"]][position] = None
+                holes.add(record["list"])
+        elif op == "add_list":
+            lists.setdefault(record["list"], [])
+        elif op == "delete_list":
+            lists.pop(record["list"], None)
+            self._forget_list(record["list"])
+        elif op == "switch":
+            self.database["current_list"] = record["list"]
+    
+    def _persist(self, record):
+        """Persist a delta record through the active storage backend"""
+        if self.store is not None:
+            self.store.apply(record)
+        else:
+            self._append_wal(record)
+    
+    def _append_wal(self, record):
+        """Queue a delta record for the background log writer"""
+        self._dirty = True
+        data = _dumps(record) + b"\n"
+        if self._wal_sync or self._wal_error is not None or not self._writer_alive():
+            self._write_wal_now(data)
+        else:
+            self._wal_queue.put(data)
+        self._wal_bytes += len(data)
+        
+        if self._wal_bytes > self.WAL_COMPACT_BYTES:
+            self._wait_for_writer()
+            self._compact()
+    
+    def _writer_alive(self):
+        """Whether the background log writer is running"""
+        return self._writer is not None and self._writer.is_alive()
+    
+    def _wait_for_writer(self):
+        """Block until the background writer has handled every queued record"""
+        if self._writer_alive():
+            self._wal_queue.join()
+    
+    def _write_wal_now(self, data):
+        """Write and fsync a log record on the calling thread, raising on failure"""
+        # Earlier records may still be queued; keep the log in order
+        self._wait_for_writer()
+        error, self._wal_error = self._wal_error, None
+        if error is not None:
+            print(f"⚠️ Background log write failed ({error}); saving changes synchronously.")
+            self._wal_sync = True
+        with self._wal_lock:
+            self._wal_fh.write(data)
+            self._sync_wal()
+    
+    def _writer_loop(self):
+        """Write queued log records, batching fsyncs by time and record count"""
+        pending = 0
+        last_sync = time.monotonic()
+        
+        while True:
+            timeout = None
+            if pending:
+                timeout = max(0.0, self.WAL_FSYNC_INTERVAL - (time.monotonic() - last_sync))
+            
+            try:
+                data = self._wal_queue.get(timeout=timeout)
+            except queue.Empty:
+                # Sync interval elapsed with records still unsynced
+                try:
+                    with self._wal_lock:
+                        self._sync_wal()
+                except Exception as e:
+                    self._wal_error = e
+                pending = 0
+                last_sync = time.monotonic()
+                continue
+            
+            try:
+                with self._wal_lock:
+                    if data is not None:
+                        self._wal_fh.write(data)
+                        pending += 1
+                    if pending and (data is None
+                                    or pending >= self.WAL_FSYNC_BATCH
+                                    or time.monotonic() - last_sync >= self.WAL_FSYNC_INTERVAL):
+                        self._sync_wal()
+                        pending = 0
+                        last_sync = time.monotonic()
+            except Exception as e:
+                # Stay alive so queue waits can't hang; _append_wal reports the error
+                self._wal_error = e
+                pending = 0
+            finally:
+                self._wal_queue.task_done()
+            
+            if data is None:
+                return
+    
+    def _sync_wal(self):
+        """Flush buffered log records and fsync them to disk"""
+        self._wal_fh.flush()
+        os.fsync(self._wal_fh.fileno())
+    
+    def _compact(self):
+        """Fold the write-ahead log into a fresh snapshot and start a new log generation"""
+        # The snapshot carries the new generation while the old log still has the
+        # previous one, so a crash before the truncate below never replays it twice
+        self._log_generation += 1
+        self._dirty = True
+        self.save_database()
+        with self._wal_lock:
+            self._wal_fh.seek(0)
+            self._wal_fh.truncate()
+            self._write_log_header()
+        self._wal_bytes = self._wal_fh.tell()
+    
+    def _write_log_header(self):
+        """Start the log with a record naming its generation"""
+        self._wal_fh.write(_dumps({"op": "generation", "gen": self._log_generation}) + b"\n")
     
     def save_database(self):
-        """Save database to file"""
+        """Atomically write a full snapshot of the database, if anything changed"""
+        if not self._dirty:
+            return
         self.database["current_list"] = self.current_list
-        with open(self.db_file, 'w') as f:
-            json.dump(self.database, f, indent=2)
+        self.database["log_generation"] = self._log_generation
+        # The temp file and the rename are both made durable before returning, so the
+        # log is never truncated while the snapshot holding its records could be lost
+        tmp = self.snapshot_file.with_name(self.snapshot_file.name + ".tmp")
+        with open(tmp, 'wb') as f:
+            f.write(_encode_snapshot(self.database))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_file)
+        if not _IS_WIN:
+            # Windows can't open directories for fsync; NTFS journals the rename
+            dir_fd = os.open(self.database_dir, os.O_RDONLY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        self._dirty = False
+    
+    def setup_path_input(self):
+        """Enable tab completion and history for path prompts when readline is available"""
+        if readline is None:
+            return
+        # Paths may contain spaces; only newlines end a completion word
+        readline.set_completer_delims("\n")
+        readline.set_completer(_path_completer)
+        if "libedit" in (readline.__doc__ or ""):
+            readline.parse_and_bind("bind ^I rl_complete")  # macOS ships libedit
+        else:
+            readline.parse_and_bind("tab: complete")
+        
+        # Only entered paths are worth recalling, not menu numbers
+        readline.set_auto_history(False)
+        readline.set_history_length(500)
+        try:
+            readline.read_history_file(self.history_file)
+        except OSError:
+            pass
+        self._history_loaded = True
+    
+    def _remember_path(self, path):
+        """Add an entered path to the readline history"""
+        if self._history_loaded:
+            readline.add_history(path)
+    
+    def close(self):
+        """Drain the log writer, compact pending records and release the log file"""
+        if self._history_loaded:
+            try:
+                readline.write_history_file(self.history_file)
+            except OSError:
+                pass
+            self._history_loaded = False
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+            return
+        if self._wal_fh is None:
+            return
+        if self._writer_alive():
+            self._wal_queue.put(None)
+            self._writer.join()
+        self._writer = None
+        if self._wal_error is not None:
+            print(f"⚠️ Background log write failed ({self._wal_error}); saving a full snapshot instead.")
+            self._wal_error = None
+        if self._dirty:
+            self._compact()
+        self._wal_fh.close()
+        self._wal_fh = None
+    
+    def _set_current_list(self, list_name):
+        """Make a list current, guaranteeing it exists, and keep a reference to its books"""
+        self.current_list = list_name
+        self._current_books = self.database["lists"].setdefault(list_name, [])
+    
+    def _get_name_index(self, list_name):
+        """Return the in-memory {book name: position} index for a list"""
+        index = self._name_index.get(list_name)
+        if index is None:
+            # An immutable () default: a log record may name a list that no longer exists
+            books = self.database["lists"].get(list_name, ())
+            index = {book_info['name']: i for i, book_info in enumerate(books)}
+            self._name_index[list_name] = index
+        return index
+    
+    def _add_to_list(self, list_name, book_info):
+        """Append a book to a list, keeping its name index current"""
+        books = self.database["lists"].setdefault(list_name, [])
+        index = self._name_index.get(list_name)
+        if index is not None:
+            index[book_info['name']] = len(books)
+        books.append(book_info)
+        view = self._list_cache.get(list_name)
+        if view is not None:
+            # Extend the display columns rather than reformatting the whole list next render
+            names, sizes, locations, dates = view
+            names.append(book_info['name'])
+            sizes.append(self.display_size(book_info))
+            locations.append(book_info['location'])
+            dates.append(self.display_added_date(book_info))
+    
+    def _remove_from_list(self, list_name, position):
+        """Remove the book at a position; later positions shift, so drop the index"""
+        del self.database["lists"][list_name][position]
+        self._forget_list(list_name)
+    
+    def _forget_list(self, list_name):
+        """Drop the derived per-list caches after a list changed shape or was deleted"""
+        self._name_index.pop(list_name, None)
+        self._list_cache.pop(list_name, None)
+    
+    def _list_dir_str(self, list_name):
+        """Return a list directory as a string ending in a path separator"""
+        prefix = self._list_dir_str_cache.get(list_name)
+        if prefix is None:
+            prefix = self._list_dir_str_cache[list_name] = self._books_dir_str + list_name + os.sep
+        return prefix
+    
+    def _get_list_view(self, list_name):
+        """Return a list's books as parallel (names, sizes, locations, dates) display columns"""
+        view = self._list_cache.get(list_name)
+        if view is None:
+            books = self.database["lists"][list_name]
+            if any(isinstance(book_info['size'], str) for book_info in books):
+                self._restore_byte_sizes(list_name, books)
+            view = (
+                [book_info['name'] for book_info in books],
+                [self.display_size(book_info) for book_info in books],
+                [book_info['location'] for book_info in books],
+                [self.display_added_date(book_info) for book_info in books],
+            )
+            self._list_cache[list_name] = view
+        return view
+    
+    def _write_book_choices(self, header):
+        """Write a header and the current list's numbered books with a single write"""
+        names, sizes, _, _ = self._get_list_view(self.current_list)
+        lines = [f"{header}\n"]
+        lines.extend(f"{i}. {name} ({size})\n" for i, (name, size) in enumerate(zip(names, sizes), 1))
+        sys.stdout.write("".join(lines))
+    
+    def _reconcile_list(self, list_name):
+        """Return {file name: size in bytes} for a list directory from one scandir pass"""
+        sizes = {}
+        try:
+            with os.scandir(self._list_dir_str(list_name)) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            sizes[entry.name] = entry.stat().st_size
+                    except OSError:
+                        continue
+        except FileNotFoundError:
+            pass
+        return sizes
+    
+    def _restore_byte_sizes(self, list_name, books):
+        """Replace pre-formatted sizes from older databases with byte counts where the file is reachable"""
+        sizes = self._reconcile_list(list_name)
+        for book_info in books:
+            if isinstance(book_info['size'], str) and book_info['name'] in sizes:
+                book_info['size'] = sizes[book_info['name']]
+                self._dirty = True
+    
+    @staticmethod
+    def _get_nth(mapping, n):
+        """Return the n-th (1-based) key of a mapping without copying its keys into a list"""
+        return next(itertools.islice(mapping, n - 1, None))
+    
+    @staticmethod
+    def _read_choice(prompt, max_n):
+        """Read a 1-based menu selection, or report why it was rejected and return None"""
+        answer = input(prompt).strip()
+        if not answer.isdecimal():
+            print("❌ Please enter a number!")
+            return None
+        choice = int(answer)
+        if not 1 <= choice <= max_n:
+            print("❌ Invalid selection!")
+            return None
+        return choice
     
     def display_ascii_art(self):
         """Display the ASCII art logo"""
-        ascii_art = """
-╔═════════════════════════════════════════════════════════════════════════╗
-║   ░█████╗░░███╗░░██╗░░░░░██╗██████╗░██████╗░░█████╗░██████╗░██╗░░░██╗   ║
-║   ██╔══██╗░███║░░██║░░░░░██║██╔══██╗██╔══██╗██╔══██╗██╔══██╗╚██╗░██╔╝   ║
-║   ██║░░██║░╚██║░░██║░░░░░██║██████╦╝██████╔╝███████║██████╔╝░╚████╔╝░   ║
-║   ██║░░██║░░██║░░██║░░░░░██║██╔══██╗██╔══██╗██╔══██║██╔══██╗░░╚██╔╝░░   ║
-║   ╚█████╔╝░░██║░░███████╗██║██████╦╝██║░░██║██║░░██║██║░░██║░░░██║░░░   ║
-║   ░╚════╝░░░╚═╝░░╚══════╝╚═╝╚═════╝░╚═╝░░╚═╝╚═╝░░╚═╝╚═╝░░╚═╝░░░╚═╝░░░   ║
-║                                                                         ║
-║                    📚 Your Personal E-book Library 📚                   ║
-║                                                                         ║
-╚═════════════════════════════════════════════════════════════════════════╝
-        """
-        print(ascii_art)
-        print(f"📁 Library Path: {self.base_dir}")
-        print(f"📂 Current List: {self.current_list}")
-        print("═" * 75)
+        sys.stdout.write(f"{self._banner_head}{self.current_list}\n{_SEP75}\n")
     
     def display_menu(self):
         """Display the main menu"""
-        menu = """
-🔹 MAIN MENU 🔹
-1. 📖 Add Book
-2. 🗑️  Delete Book
-3. 📋 Add List
-4. 🗂️  Delete List
-5. 📚 Switch Lists
-6. 📜 Show All Books
-7. 📂 Open Book
-8. 🚪 Exit
-
-Choose an option (1-8): """
-        return input(menu).strip()
+        return input(MENU).strip()
     
     def add_book(self):
         """Add a new book to the current list"""
@@ -110,97 +838,160 @@ Choose an option (1-8): """
         if not book_path:
             print("❌ No path provided!")
             return
+        self._remember_path(book_path)
         
         book_path = Path(book_path)
+        abs_path = os.path.abspath(book_path)
         
-        if not book_path.exists():
+        # One stat call answers existence, file type and size
+        try:
+            st = os.stat(abs_path)
+        except (FileNotFoundError, NotADirectoryError):
             print("❌ File doesn't exist!")
             return
         
-        if not book_path.is_file():
+        if not stat.S_ISREG(st.st_mode):
             print("❌ Path is not a file!")
             return
         
-        # Get book info
-        book_name = book_path.name
-        book_size = self.format_size(book_path.stat().st_size)
-        
-        # Create list directory if it doesn't exist
-        list_dir = self.books_dir / self.current_list
-        list_dir.mkdir(exist_ok=True)
-        
-        # Create symlink
-        symlink_path = list_dir / book_name
-        
-        # Handle duplicate names
-        counter = 1
-        original_name = book_path.stem
-        extension = book_path.suffix
-        
-        while symlink_path.exists():
-            new_name = f"{original_name}_{counter}{extension}"
-            symlink_path = list_dir / new_name
-            counter += 1
-        
         try:
-            # Create symlink
-            if os.name == 'nt':  # Windows
-                shutil.copy2(book_path, symlink_path)
-                print("📝 Note: Created copy instead of symlink (Windows)")
-            else:  # Unix/Linux/Mac
-                os.symlink(book_path.absolute(), symlink_path)
-            
-            # Add to database
-            if self.current_list not in self.database["lists"]:
-                self.database["lists"][self.current_list] = {}
+            new_name = self._link_into_list(abs_path, book_path.name)
             
-            self.database["lists"][self.current_list][symlink_path.name] = {
-                "name": symlink_path.name,
-                "size": book_size,
-                "location": str(book_path.absolute()),
-                "added_date": datetime.now().isoformat()
-            }
+            if _IS_WIN:
+                print("📝 Note: Created copy instead of symlink (Windows)")
             
-            self.save_database()
-            print(f"✅ Successfully added '{symlink_path.name}' ({book_size})")
+            self._record_book(new_name, st.st_size, abs_path)
+            print(f"✅ Successfully added '{new_name}' ({self.format_size(st.st_size)})")
             
         except Exception as e:
             print(f"❌ Error adding book: {e}")
     
+    def import_folder(self):
+        """Add every file in a folder to the current list"""
+        print(f"\n📥 Importing folder into list: '{self.current_list}'")
+        folder = input("Enter the full path to the folder: ").strip()
+        
+        if not folder:
+            print("❌ No path provided!")
+            return
+        self._remember_path(folder)
+        
+        # One scandir pass yields every name, file type and size
+        files = []
+        try:
+            with os.scandir(os.path.abspath(folder)) as entries:
+                for entry in entries:
+                    # Hidden files and OS thumbnails/metadata are never books
+                    if entry.name.startswith('.') or entry.name in _IGNORED_FILES:
+                        continue
+                    try:
+                        if entry.is_file():
+                            files.append((entry.name, entry.path, entry.stat().st_size))
+                    except OSError as e:
+                        print(f"❌ Skipped '{entry.name}': {e}")
+        except (FileNotFoundError, NotADirectoryError):
+            print("❌ Folder doesn't exist!")
+            return
+        except OSError as e:
+            print(f"❌ Error reading folder: {e}")
+            return
+        
+        files.sort()
+        if not files:
+            print("📭 No files found in that folder")
+            return
+        
+        added = 0
+        for name, path, size in files:
+            if not _is_storable(path):
+                print(f"❌ Skipped {name!r}: the name is not valid UTF-8")
+                continue
+            try:
+                new_name = self._link_into_list(path, name)
+                self._record_book(new_name, size, path)
+                added += 1
+            except Exception as e:
+                print(f"❌ Error adding '{name}': {e}")
+        
+        if _IS_WIN and added:
+            print("📝 Note: Created copies instead of symlinks (Windows)")
+        print(f"✅ Imported {added} of {len(files)} books")
+    
+    def _link_into_list(self, abs_path, book_name):
+        """Link a file into the current list directory under a free name and return that name"""
+        list_dir = self._list_dir_str(self.current_list)
+        
+        # Resolve duplicate names in memory: the database knows every book in the list
+        taken = self._get_name_index(self.current_list)
+        counter = 1
+        original_name, extension = os.path.splitext(book_name)
+        new_name = book_name
+        
+        while True:
+            while new_name in taken:
+                new_name = f"{original_name}_{counter}{extension}"
+                counter += 1
+            
+            # Create symlink
+            try:
+                _link_book(abs_path, list_dir + new_name)
+                return new_name
+            except FileExistsError:
+                # A file the database doesn't track already uses this name
+                taken = {*taken, new_name}
+            except FileNotFoundError:
+                # Startup creates every list directory; this one was removed since
+                if os.path.isdir(list_dir):
+                    raise
+                os.makedirs(list_dir)
+    
+    def _record_book(self, name, size, abs_path):
+        """Add a linked book to the current list and persist it"""
+        book = {
+            "name": name,
+            "size": size,
+            "location": abs_path,
+            "added_date": time.time()
+        }
+        self._add_to_list(self.current_list, book)
+        try:
+            self._persist({"op": "add_book", "list": self.current_list, "book": book})
+        except Exception:
+            # Unsaved books must not linger in memory or on disk
+            self._remove_from_list(self.current_list, len(self._current_books) - 1)
+            try:
+                os.unlink(self._list_dir_str(self.current_list) + name)
+            except FileNotFoundError:
+                pass
+            raise
+    
     def delete_book(self):
         """Delete a book from the current list"""
-        books = self.database["lists"].get(self.current_list, {})
+        books = self._current_books
         
         if not books:
             print(f"📭 No books in list '{self.current_list}'")
             return
         
-        print(f"\n🗑️ Delete book from '{self.current_list}':")
-        book_names = list(books.keys())
+        self._write_book_choices(f"\n🗑️ Delete book from '{self.current_list}':")
         
-        for i, book_name in enumerate(book_names, 1):
-            book_info = books[book_name]
-            print(f"{i}. {book_info['name']} ({book_info['size']})")
+        choice = self._read_choice(f"\nSelect book to delete (1-{len(books)}): ", len(books))
+        if choice is None:
+            return
+        
+        book_name = books[choice - 1]['name']
         
+        # Remove symlink
         try:
-            choice = int(input(f"\nSelect book to delete (1-{len(book_names)}): "))
-            if 1 <= choice <= len(book_names):
-                book_name = book_names[choice - 1]
-                
-                # Remove symlink
-                symlink_path = self.books_dir / self.current_list / book_name
-                if symlink_path.exists():
-                    symlink_path.unlink()
-                
-                # Remove from database
-                del self.database["lists"][self.current_list][book_name]
-                self.save_database()
-                
-                print(f"✅ Deleted '{book_name}'")
-            else:
-                print("❌ Invalid selection!")
-        except ValueError:
-            print("❌ Please enter a number!")
+            os.unlink(self._list_dir_str(self.current_list) + book_name)
+        except FileNotFoundError:
+            pass
+        
+        # Remove from database
+        self._remove_from_list(self.current_list, choice - 1)
+        self._persist({"op": "delete_book", "list": self.current_list, "name": book_name})
+        
+        print(f"✅ Deleted '{book_name}'")
     
     def add_list(self):
         """Add a new list"""
@@ -219,205 +1010,199 @@ Choose an option (1-8): """
         list_dir.mkdir(exist_ok=True)
         
         # Add to database
-        self.database["lists"][list_name] = {}
-        self.save_database()
+        self.database["lists"][list_name] = []
+        self._persist({"op": "add_list", "list": list_name})
         
         print(f"✅ Created list '{list_name}'")
     
     def delete_list(self):
         """Delete a list"""
-        lists = list(self.database["lists"].keys())
+        lists = self.database["lists"]
         
         if len(lists) <= 1:
             print("❌ Cannot delete the last remaining list!")
             return
         
-        print("\n🗂️ Available lists:")
-        for i, list_name in enumerate(lists, 1):
-            book_count = len(self.database["lists"][list_name])
-            print(f"{i}. {list_name} ({book_count} books)")
+        lines = ["\n🗂️ Available lists:\n"]
+        lines.extend(f"{i}. {list_name} ({len(books)} books)\n"
+                     for i, (list_name, books) in enumerate(lists.items(), 1))
+        sys.stdout.write("".join(lines))
         
-        try:
-            choice = int(input(f"\nSelect list to delete (1-{len(lists)}): "))
-            if 1 <= choice <= len(lists):
-                list_name = lists[choice - 1]
-                
-                if list_name == self.current_list:
-                    print("❌ Cannot delete the current active list!")
-                    return
-                
-                # Remove directory and all symlinks
-                list_dir = self.books_dir / list_name
-                if list_dir.exists():
-                    shutil.rmtree(list_dir)
-                
-                # Remove from database
-                del self.database["lists"][list_name]
-                self.save_database()
-                
-                print(f"✅ Deleted list '{list_name}'")
-            else:
-                print("❌ Invalid selection!")
-        except ValueError:
-            print("❌ Please enter a number!")
+        choice = self._read_choice(f"\nSelect list to delete (1-{len(lists)}): ", len(lists))
+        if choice is None:
+            return
+        
+        list_name = self._get_nth(lists, choice)
+        
+        if list_name == self.current_list:
+            print("❌ Cannot delete the current active list!")
+            return
+        
+        # Remove the symlinks the database knows about, then the directory
+        list_dir = self._list_dir_str(list_name)
+        for book_info in self.database["lists"][list_name]:
+            try:
+                os.unlink(list_dir + book_info['name'])
+            except FileNotFoundError:
+                pass
+        # No trailing separator here: "foo/" resolves through a symlinked list directory
+        list_path = self.books_dir / list_name
+        if os.path.islink(list_path):
+            # A list kept elsewhere; drop the link, never the files it points to
+            os.unlink(list_path)
+        else:
+            try:
+                os.rmdir(list_path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                # Stray files the database doesn't track
+                shutil.rmtree(list_path)
+        
+        # Remove from database
+        del self.database["lists"][list_name]
+        self._forget_list(list_name)
+        self._persist({"op": "delete_list", "list": list_name})
+        
+        print(f"✅ Deleted list '{list_name}'")
     
     def switch_lists(self):
         """Switch between lists"""
-        lists = list(self.database["lists"].keys())
+        lists = self.database["lists"]
         
         if len(lists) == 1:
-            print(f"📋 Only one list available: '{lists[0]}'")
+            print(f"📋 Only one list available: '{self._get_nth(lists, 1)}'")
             return
         
-        print("\n📚 Available lists:")
-        for i, list_name in enumerate(lists, 1):
-            book_count = len(self.database["lists"][list_name])
-            current = " (current)" if list_name == self.current_list else ""
-            print(f"{i}. {list_name} ({book_count} books){current}")
+        current_list = self.current_list
+        lines = ["\n📚 Available lists:\n"]
+        lines.extend(f"{i}. {list_name} ({len(books)} books)"
+                     f"{' (current)' if list_name == current_list else ''}\n"
+                     for i, (list_name, books) in enumerate(lists.items(), 1))
+        sys.stdout.write("".join(lines))
         
-        try:
-            choice = int(input(f"\nSelect list to switch to (1-{len(lists)}): "))
-            if 1 <= choice <= len(lists):
-                self.current_list = lists[choice - 1]
-                self.save_database()
-                print(f"✅ Switched to list '{self.current_list}'")
-            else:
-                print("❌ Invalid selection!")
-        except ValueError:
-            print("❌ Please enter a number!")
+        choice = self._read_choice(f"\nSelect list to switch to (1-{len(lists)}): ", len(lists))
+        if choice is None:
+            return
+        
+        list_name = self._get_nth(lists, choice)
+        if list_name != current_list:
+            # Only the pointer moves, so log a tiny switch record, not a snapshot
+            self._set_current_list(list_name)
+            self._persist({"op": "switch", "list": self.current_list})
+        print(f"✅ Switched to list '{self.current_list}'")
     
     def show_all_books(self):
         """Show all books in current list"""
-        books = self.database["lists"].get(self.current_list, {})
+        books = self._current_books
         
         if not books:
             print(f"📭 No books in list '{self.current_list}'")
             return
         
-        print(f"\n📜 Books in '{self.current_list}':")
-        print("═" * 60)
-        
-        for i, (book_name, book_info) in enumerate(books.items(), 1):
-            print(f"{i:2d}. 📖 {book_info['name']}")
-            print(f"     📏 Size: {book_info['size']}")
-            print(f"     📍 Location: {book_info['location']}")
-            if 'added_date' in book_info:
-                date_added = datetime.fromisoformat(book_info['added_date']).strftime("%Y-%m-%d %H:%M")
-                print(f"     📅 Added: {date_added}")
-            print()
+        # Walk the pre-formatted columns and emit the whole listing with a single write
+        blocks = [
+            f"{i:2d}. 📖 {name}\n"
+            f"     📏 Size: {size}\n"
+            f"     📍 Location: {location}\n"
+            + (f"     📅 Added: {added}\n" if added is not None else "")
+            for i, (name, size, location, added) in enumerate(zip(*self._get_list_view(self.current_list)), 1)
+        ]
+        sys.stdout.write(f"\n📜 Books in '{self.current_list}':\n{_SEP60}\n" + "\n".join(blocks) + "\n")
     
     @staticmethod
     def format_size(size_bytes):
         """Format file size in human readable format"""
-        if size_bytes == 0:
+        if size_bytes <= 0:
             return "0 B"
-        size_names = ["B", "KB", "MB", "GB", "TB"]
-        i = 0
-        while size_bytes >= 1024 and i < len(size_names) - 1:
-            size_bytes /= 1024.0
-            i += 1
-        return f"{size_bytes:.1f} {size_names[i]}"
+        # Each unit step is 10 bits, so the bit length picks the unit directly
+        i = min((size_bytes.bit_length() - 1) // 10, len(_SIZE_UNITS) - 1)
+        return f"{size_bytes / (1 << (10 * i)):.1f} {_SIZE_UNITS[i]}"
     
+    @classmethod
+    def display_size(cls, book_info):
+        """Format a book's stored size; older databases kept it pre-formatted"""
+        size = book_info['size']
+        if isinstance(size, str):
+            return size
+        return cls.format_size(size)
+    
+    @staticmethod
+    def display_added_date(book_info):
+        """Format a book's added date for listings, or None if it has none"""
+        if 'added_date' not in book_info:
+            return None
+        return time.strftime('%Y-%m-%d %H:%M', time.localtime(book_info['added_date']))
     
     def open_book(self):
         """Open a selected book with the default system application"""
-        books = self.database["lists"].get(self.current_list, {})
+        books = self._current_books
         
         if not books:
             print(f"📭 No books in list '{self.current_list}'")
             return
         
-        print(f"\n📂 Open book from '{self.current_list}':")
-        book_names = list(books.keys())
+        self._write_book_choices(f"\n📂 Open book from '{self.current_list}':")
+        
+        choice = self._read_choice(f"\nSelect book to open (1-{len(books)}): ", len(books))
+        if choice is None:
+            return
+        
+        book_info = books[choice - 1]
+        
+        original_path = book_info['location']
+        symlink_path = self._list_dir_str(self.current_list) + book_info['name']
         
-        for i, book_name in enumerate(book_names, 1):
-            book_info = books[book_name]
-            print(f"{i}. {book_info['name']} ({book_info['size']})")
+        print(f"📂 Opening '{book_info['name']}'...")
         
+        # Try to open the original file first, then the symlink
+        file_to_open = original_path
         try:
-            choice = int(input(f"\nSelect book to open (1-{len(book_names)}): "))
-            if 1 <= choice <= len(book_names):
-                book_name = book_names[choice - 1]
-                book_info = books[book_name]
-                
-                # Try to open the original file first, then the symlink
-                original_path = Path(book_info['location'])
-                symlink_path = self.books_dir / self.current_list / book_name
-                
-                file_to_open = None
-                if original_path.exists():
-                    file_to_open = original_path
-                elif symlink_path.exists():
-                    file_to_open = symlink_path
-                else:
-                    print(f"❌ Book file not found! Original: {original_path}")
-                    print("The file may have been moved or deleted.")
-                    return
-                
-                print(f"📂 Opening '{book_info['name']}'...")
-                
-                try:
-                    # Cross-platform file opening
-                    system = platform.system()
-                    if system == "Windows":
-                        os.startfile(str(file_to_open))
-                    elif system == "Darwin":  # macOS
-                        subprocess.run(["open", str(file_to_open)], check=True)
-                    else:  # Linux and other Unix-like systems
-                        subprocess.run(["xdg-open", str(file_to_open)], check=True)
-                    
-                    print("✅ Book opened successfully!")
-                    
-                except subprocess.CalledProcessError:
-                    print("❌ Failed to open the book. No default application found.")
-                except Exception as e:
-                    print(f"❌ Error opening book: {e}")
-                    print("You can manually open the file at:")
-                    print(f"📍 {file_to_open}")
-            else:
-                print("❌ Invalid selection!")
-        except ValueError:
-            print("❌ Please enter a number!")
-    
+            try:
+                _open_file(original_path)
+            except FileNotFoundError:
+                file_to_open = symlink_path
+                _open_file(symlink_path)
+            
+            print("✅ Book opened successfully!")
+            
+        except FileNotFoundError:
+            print(f"❌ Book file not found! Original: {original_path}")
+            print("The file may have been moved or deleted.")
+        except Exception as e:
+            print(f"❌ Error opening book: {e}")
+            print("You can manually open the file at:")
+            print(f"📍 {file_to_open}")
     
     def run(self):
         """Main application loop"""
+        self.setup_path_input()
         while True:
-            os.system('clear' if os.name == 'posix' else 'cls')  # Clear screen
+            _clear_screen()
             self.display_ascii_art()
             
             choice = self.display_menu()
             
-            if choice == '1':
-                self.add_book()
-            elif choice == '2':
-                self.delete_book()
-            elif choice == '3':
-                self.add_list()
-            elif choice == '4':
-                self.delete_list()
-            elif choice == '5':
-                self.switch_lists()
-            elif choice == '6':
-                self.show_all_books()
-            elif choice == '7':
-                self.open_book()
+            handler = self._dispatch.get(choice)
+            if handler is not None:
+                handler()
             elif choice == '8':
-                print("\n" + "═" * 75)
+                print("\n" + _SEP75)
                 print("👋 Thank you for using 01LIBRARY!")
                 print("📧 For support or feedback: [pbhtash@gmail.com]")
                 print("🌟 Star us on GitHub: https://github.com/PedramBHT/01library")
                 print("📄 Licensed under MIT - Free and Open Source!")
-                print("═" * 75)
+                print(_SEP75)
                 break
             else:
-                print("❌ Invalid option! Please choose 1-8.")
+                print("❌ Invalid option! Please choose 1-9.")
             
             if choice != '8':
                 input("\nPress Enter to continue...")
 
 def main():
     """Main entry point"""
+    library = None
     try:
         library = EbookLibrary()
         library.run()
@@ -427,6 +1212,9 @@ def main():
     except Exception as e:
         print(f"\n❌ An error occurred: {e}")
         sys.exit(1)
+    finally:
+        if library is not None:
+            library.close()
 
 if __name__ == "__main__":
     main()
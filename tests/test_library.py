@@ -0,0 +1,194 @@
+"""Persistence tests for 01library: log replay, torn tails and compaction crashes"""
+
+import contextlib
+import importlib.util
+import io
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+_SPEC = importlib.util.spec_from_file_location(
+    "library01", Path(__file__).resolve().parent.parent / "01library.py")
+library01 = importlib.util.module_from_spec(_SPEC)
+_SPEC.loader.exec_module(library01)
+
+
+class LibraryTestCase(unittest.TestCase):
+    def setUp(self):
+        self.home = tempfile.TemporaryDirectory()
+        self.addCleanup(self.home.cleanup)
+        patcher = mock.patch.dict(os.environ, {"HOME": self.home.name, "USERPROFILE": self.home.name})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        os.environ.pop(library01.EbookLibrary.BACKEND_ENV, None)
+        self.src = Path(self.home.name) / "src"
+        self.src.mkdir()
+
+    def open_library(self):
+        """Open the library in the temporary home, silencing its output"""
+        with contextlib.redirect_stdout(io.StringIO()):
+            return library01.EbookLibrary()
+
+    def add_books(self, library, *names):
+        """Add source files with the given names through add_book"""
+        paths = []
+        for name in names:
+            path = self.src / name
+            path.write_bytes(b"x")
+            paths.append(str(path))
+        with mock.patch("builtins.input", side_effect=paths), contextlib.redirect_stdout(io.StringIO()):
+            for _ in names:
+                library.add_book()
+
+    def delete_book(self, library, position):
+        """Delete the book at a 1-based position through delete_book"""
+        with mock.patch("builtins.input", return_value=str(position)), \
+                contextlib.redirect_stdout(io.StringIO()):
+            library.delete_book()
+
+    @staticmethod
+    def crash(library):
+        """Stop a library with its log durable but without compacting it"""
+        library._wait_for_writer()
+        with library._wal_lock:
+            library._sync_wal()
+        library._wal_queue.put(None)
+        library._writer.join()
+        library._wal_fh.close()
+
+    @staticmethod
+    def book_names(library, list_name="default"):
+        return [book_info['name'] for book_info in library.database["lists"][list_name]]
+
+
+class ReplayTests(LibraryTestCase):
+    def test_replay_restores_records_not_yet_compacted(self):
+        library = self.open_library()
+        self.add_books(library, "a.pdf", "b.pdf")
+        self.crash(library)
+
+        reopened = self.open_library()
+        self.addCleanup(reopened.close)
+        self.assertEqual(self.book_names(reopened), ["a.pdf", "b.pdf"])
+
+    def test_replayed_deletes_keep_order_and_index(self):
+        library = self.open_library()
+        self.add_books(library, "a.pdf", "b.pdf", "c.pdf", "d.pdf")
+        self.delete_book(library, 2)
+        self.delete_book(library, 3)
+        self.crash(library)
+
+        reopened = self.open_library()
+        self.addCleanup(reopened.close)
+        self.assertEqual(self.book_names(reopened), ["a.pdf", "c.pdf"])
+        self.assertEqual(reopened._get_name_index("default"), {"a.pdf": 0, "c.pdf": 1})
+
+    def test_torn_tail_is_cut_before_new_records(self):
+        library = self.open_library()
+        self.add_books(library, "a.pdf")
+        self.crash(library)
+        with open(library.wal_file, 'ab') as f:
+            f.write(b'{"op":"add_li')
+
+        second = self.open_library()
+        self.add_books(second, "b.pdf")
+        self.crash(second)
+
+        third = self.open_library()
+        self.addCleanup(third.close)
+        self.assertEqual(self.book_names(third), ["a.pdf", "b.pdf"])
+
+    def test_crash_between_snapshot_and_truncate_does_not_duplicate(self):
+        library = self.open_library()
+        self.add_books(library, "a.pdf", "b.pdf")
+        library._wait_for_writer()
+        with library._wal_lock:
+            library._sync_wal()
+        old_log = library.wal_file.read_bytes()
+        library.close()
+        # The snapshot was replaced but the log truncate never reached the disk
+        library.wal_file.write_bytes(old_log)
+
+        reopened = self.open_library()
+        self.assertEqual(self.book_names(reopened), ["a.pdf", "b.pdf"])
+        self.add_books(reopened, "c.pdf")
+        self.crash(reopened)
+
+        # The stale log was discarded, not left in front of the new records
+        final = self.open_library()
+        self.addCleanup(final.close)
+        self.assertEqual(self.book_names(final), ["a.pdf", "b.pdf", "c.pdf"])
+
+    def test_unchanged_library_is_not_rewritten(self):
+        library = self.open_library()
+        self.add_books(library, "a.pdf")
+        library.close()
+        mtime = os.stat(library.snapshot_file).st_mtime_ns
+
+        reopened = self.open_library()
+        reopened.close()
+        self.assertEqual(os.stat(library.snapshot_file).st_mtime_ns, mtime)
+
+
+class MigrationTests(LibraryTestCase):
+    def test_legacy_dict_lists_and_iso_dates_are_converted(self):
+        library = self.open_library()
+        library.close()
+        legacy = {
+            "lists": {"default": {"a.pdf": {"name": "a.pdf", "size": "1.0 B", "location": "/nowhere/a.pdf",
+                                            "added_date": "2024-01-02T03:04:05"}}},
+            "current_list": "default",
+        }
+        library.snapshot_file.write_bytes(library01._encode_snapshot(legacy))
+
+        reopened = self.open_library()
+        self.addCleanup(reopened.close)
+        book_info = reopened.database["lists"]["default"][0]
+        self.assertEqual(book_info['name'], "a.pdf")
+        self.assertIsInstance(book_info['added_date'], float)
+
+
+class ListDirectoryTests(LibraryTestCase):
+    def test_dangling_list_link_does_not_block_startup(self):
+        library = self.open_library()
+        library.database["lists"]["ext"] = []
+        library._persist({"op": "add_list", "list": "ext"})
+        library.close()
+        os.symlink(Path(self.home.name) / "unmounted", library.books_dir / "ext")
+
+        reopened = self.open_library()
+        self.addCleanup(reopened.close)
+        self.assertEqual(sorted(reopened.database["lists"]), ["default", "ext"])
+
+
+class ImportFolderTests(LibraryTestCase):
+    def test_import_skips_hidden_and_metadata_files(self):
+        for name in ("b.pdf", "a.epub", ".DS_Store", "Thumbs.db"):
+            (self.src / name).write_bytes(b"x")
+        (self.src / "sub").mkdir()
+        library = self.open_library()
+        self.addCleanup(library.close)
+        with mock.patch("builtins.input", return_value=str(self.src)), \
+                contextlib.redirect_stdout(io.StringIO()):
+            library.import_folder()
+        self.assertEqual(self.book_names(library), ["a.epub", "b.pdf"])
+
+
+class SqliteStoreTests(unittest.TestCase):
+    def test_failed_delete_list_rolls_back(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            store = library01.SqliteStore(os.path.join(tmp, "library.sqlite3"))
+            self.addCleanup(store.close)
+            store.apply({"op": "add_list", "list": "x"})
+            # Make the second DELETE of the transaction fail
+            store.conn.execute("CREATE TRIGGER keep BEFORE DELETE ON lists "
+                               "BEGIN SELECT RAISE(ABORT, 'blocked'); END")
+            with self.assertRaises(Exception):
+                store.apply({"op": "delete_list", "list": "x"})
+            self.assertFalse(store.conn.in_transaction)
+
+
+if __name__ == "__main__":
+    unittest.main()